@@ -1,22 +1,65 @@
-from flask import Flask, render_template, request, jsonify, send_file
+# Patch the stdlib before anything else imports it so blocking I/O yields to other green threads
+import eventlet
+eventlet.monkey_patch()
+
+from flask import Flask, Response, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO, emit, join_room
 from flask_cors import CORS
-from models import db, Admin, Quiz, QuizItem, GameSession, Participant, ParticipantAnswer
-from werkzeug.security import generate_password_hash, check_password_hash
+from models import db, Admin, Quiz, QuizItem, GameSession, Participant, ParticipantAnswer, LAYOUT_STYLES
+from sqlalchemy import event, func, lambda_stmt
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import object_session
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import check_password_hash
 from werkzeug.utils import secure_filename
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from eventlet import tpool
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 from dotenv import load_dotenv
+from zipstream import ZipStream
 import os
 import csv
+import orjson
 import zipfile
 import shutil
-from io import BytesIO, StringIO
+import tempfile
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import StringIO, TextIOWrapper
 from pathlib import Path
+from urllib.parse import quote, unquote, urlparse
 from datetime import datetime, timezone
-import random
-import string
+import secrets
+import sqlite3
+import unicodedata
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    
+    def dumps(self, obj, **kwargs):
+        # Datetimes are passed through to Flask's default() so responses keep the same format
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+class OrjsonSocketIOJSON:
+    """Stand-in for the json module used to encode Socket.IO packets"""
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__, static_folder='static', static_url_path='', template_folder='templates')
+app.json = OrjsonProvider(app)
 
 # Configuration
 DATABASE_URL = os.environ.get('DATABASE_URL')
@@ -25,6 +68,24 @@ if DATABASE_URL and DATABASE_URL.startswith('postgres://'):
 
 app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL or 'sqlite:///dragdrop_quiz.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_pre_ping': True,  # Replace connections dropped by the server before handing them out
+    'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800))
+}
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update({
+        # Size per worker process, roughly to its concurrent requests
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 40)),
+        # Batch executemany INSERTs into multi-row VALUES statements
+        'executemany_mode': 'values_plus_batch',
+        'insertmanyvalues_page_size': 1000,
+        'connect_args': {
+            'application_name': 'drag-drop-quiz',
+            'options': '-c statement_timeout=5000'
+        }
+    })
+
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -35,7 +96,15 @@ CORS(app, resources={r"/api/*": {"origins": "*"}})  # Configure CORS for API rou
 
 # Socket.IO configuration
 # async_mode is auto-detected based on installed packages (eventlet is in requirements.txt)
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", json=OrjsonSocketIOJSON)
+
+# SQLite only applies ON DELETE CASCADE when foreign keys are switched on per connection
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
 
 # Create database tables and upload folder (only once)
 def init_db():
@@ -47,6 +116,8 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # GCS configuration
 GCS_BUCKET_NAME = 'drag-drop-quiz-uploads'
+GCS_UPLOAD_WORKERS = 16
+GCS_CHUNK_SIZE = 8 * 1024 * 1024  # Files above this size use multipart uploads
 gcs_client = None
 
 def get_gcs_client():
@@ -59,23 +130,45 @@ def get_gcs_client():
             return None
     return gcs_client
 
-def upload_file_to_gcs(file_content, filename):
-    """Upload file to Google Cloud Storage and return public URL"""
+def gcs_public_url(filename):
+    """Build the public URL of a blob (read access comes from the bucket IAM policy)"""
+    return f"https://storage.googleapis.com/{GCS_BUCKET_NAME}/{quote(filename)}"
+
+def upload_fileobj_to_gcs(file_obj, filename, content_type='image/webp', size=None):
+    """Stream a file-like object to Google Cloud Storage and return public URL"""
+    start = file_obj.tell()
+    if size is None:
+        size = file_obj.seek(0, os.SEEK_END) - start
+        file_obj.seek(start)
+    
     try:
         client = get_gcs_client()
         if client is None:
             # Fallback to local storage if GCS unavailable
-            return upload_file_locally(file_content, filename)
+            return upload_file_locally(file_obj, filename)
         
         bucket = client.bucket(GCS_BUCKET_NAME)
         blob = bucket.blob(filename)
-        blob.upload_from_string(file_content, content_type='image/webp')
-        # Make blob publicly readable
-        blob.make_public()
-        return blob.public_url
+        if size > GCS_CHUNK_SIZE:
+            # Large files are spooled to disk and uploaded as parallel multipart chunks
+            with tempfile.NamedTemporaryFile() as tmp:
+                shutil.copyfileobj(file_obj, tmp)
+                tmp.flush()
+                transfer_manager.upload_chunks_concurrently(
+                    tmp.name,
+                    blob,
+                    content_type=content_type,
+                    chunk_size=GCS_CHUNK_SIZE,
+                    max_workers=8,
+                    worker_type=transfer_manager.THREAD
+                )
+        else:
+            blob.upload_from_file(file_obj, content_type=content_type, size=size)
+        return gcs_public_url(filename)
     except Exception as e:
         print(f"GCS upload error: {e}. Falling back to local storage.")
-        return upload_file_locally(file_content, filename)
+        file_obj.seek(start)
+        return upload_file_locally(file_obj, filename)
 
 def upload_file_locally(file_content, filename):
     """Fallback: Upload file to local filesystem"""
@@ -85,12 +178,69 @@ def upload_file_locally(file_content, filename):
         if isinstance(file_content, bytes):
             f.write(file_content)
         else:
-            f.write(file_content.read())
+            shutil.copyfileobj(file_content, f)
     return f"/static/uploads/{filename}"
 
+# Password hashing helpers
+# Hashing runs on a native thread via tpool so it doesn't stall the eventlet loop
+# Cost is tunable per deployment; aim for ~50 ms per hash on the target CPU
+password_hasher = PasswordHasher(
+    time_cost=int(os.environ.get('ARGON2_TIME_COST', 2)),
+    memory_cost=int(os.environ.get('ARGON2_MEMORY_COST', 19456)),  # KiB
+    parallelism=1
+)
+
+def hash_password(password):
+    """Hash a password with argon2id"""
+    return tpool.execute(password_hasher.hash, password)
+
+def password_needs_rehash(password_hash):
+    """Check if a hash is a legacy werkzeug hash or uses outdated argon2 parameters"""
+    if not password_hash.startswith('$argon2'):
+        return True
+    return password_hasher.check_needs_rehash(password_hash)
+
+def verify_password(password_hash, password):
+    """Check a password against an argon2 hash or a legacy werkzeug hash"""
+    if not password_hash.startswith('$argon2'):
+        return tpool.execute(check_password_hash, password_hash, password)
+    try:
+        return tpool.execute(password_hasher.verify, password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+class LRUDict(OrderedDict):
+    """Dict that keeps only the maxsize most recently used entries"""
+    
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+    
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+    
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
 # Helper function to generate game code
+GAME_CODE_TRANSLATION = str.maketrans('-_', '00')
+GAME_CODE_ATTEMPTS = 3
+
+# Open (waiting or active) games created or seen by this process: {game_code: game_session_id}.
+# Bounded like GAME_CACHE; join_game and get_results look evicted codes up in the database again.
+ACTIVE_GAMES_SIZE = 5000
+ACTIVE_GAMES = LRUDict(ACTIVE_GAMES_SIZE)
+
 def generate_game_code():
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+    return secrets.token_urlsafe(6)[:6].translate(GAME_CODE_TRANSLATION).upper()
 
 # Helper functions for import/export
 def get_next_filename(base_name, directory):
@@ -106,78 +256,133 @@ def get_next_filename(base_name, directory):
     
     return new_name
 
+def get_quiz_item_dicts(quiz_id):
+    """Load a quiz's items in display order as plain dicts, skipping ORM object construction"""
+    # lambda_stmt caches the built statement, so repeat calls only bind quiz_id
+    rows = db.session.execute(lambda_stmt(lambda: db.select(
+        QuizItem.item_id,
+        QuizItem.text,
+        QuizItem.image_url,
+        QuizItem.correct_position,
+        QuizItem.item_order
+    ).where(QuizItem.quiz_id == quiz_id).order_by(QuizItem.item_order))).all()
+    return [row._asdict() for row in rows]
+
 def validate_image_file(filename):
     """Check if file is a valid image"""
     allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
+def iter_gcs_blob(blob, chunk_size=1024 * 1024):
+    """Yield the contents of a GCS blob in chunks without buffering the whole object"""
+    with blob.open('rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
 def export_quiz_to_zip(quiz_id, admin_id):
-    """Export quiz with images as ZIP file"""
+    """Export quiz with images as a streamed ZIP file"""
     quiz = Quiz.query.filter_by(quiz_id=quiz_id, admin_id=admin_id).first()
     if not quiz:
         return None, "Quiz not found"
     
-    items = QuizItem.query.filter_by(quiz_id=quiz_id).order_by(QuizItem.item_order).all()
+    # Stream plain rows in batches (server-side cursor on PostgreSQL) instead of building ORM objects
+    items = db.session.execute(
+        db.select(
+            QuizItem.text,
+            QuizItem.image_url,
+            QuizItem.original_filename,
+            QuizItem.correct_position,
+            QuizItem.item_order
+        )
+        .where(QuizItem.quiz_id == quiz_id)
+        .order_by(QuizItem.item_order)
+        .execution_options(yield_per=1000)
+    )
     
-    # Create in-memory ZIP
-    zip_buffer = BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Create CSV content
-        csv_buffer = StringIO()
-        csv_writer = csv.writer(csv_buffer)
-        csv_writer.writerow(['text', 'correct_position', 'item_order', 'image_file'])
-        
-        # Track filenames to handle duplicates
-        filename_map = {}
+    # Members are read lazily while the response is being sent. Images are
+    # already compressed, so they are stored as-is and only text is deflated.
+    zip_stream = ZipStream(compress_type=zipfile.ZIP_STORED)
+    
+    # Create CSV content
+    csv_buffer = StringIO()
+    csv_writer = csv.writer(csv_buffer)
+    csv_writer.writerow(['text', 'correct_position', 'item_order', 'image_file'])
+    
+    # Track filenames to handle duplicates
+    name_counts = Counter()
+    
+    # (image_url, arcname) in item order, added once GCS blobs are resolved
+    images = []
+    
+    for item in items:
+        # Get original filename or extract from URL
+        base_filename = item.original_filename or os.path.basename(item.image_url)
         
-        for item in items:
-            # Get original filename or extract from URL
-            if item.original_filename:
-                base_filename = item.original_filename
-            else:
-                base_filename = os.path.basename(item.image_url)
-            
-            # Handle duplicate filenames
-            if base_filename in filename_map:
-                name, ext = os.path.splitext(base_filename)
-                filename_map[base_filename] += 1
-                unique_filename = f"{name}_{filename_map[base_filename]}{ext}"
-            else:
-                filename_map[base_filename] = 0
-                unique_filename = base_filename
-            
-            csv_writer.writerow([
-                item.text or '',
-                item.correct_position,
-                item.item_order,
-                unique_filename
-            ])
-            
-            # Add image to ZIP
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], os.path.basename(item.image_url))
-            if os.path.exists(image_path):
-                zip_file.write(image_path, arcname=f"images/{unique_filename}")
+        # Handle duplicate filenames
+        duplicate_count = name_counts[base_filename]
+        name_counts[base_filename] += 1
+        if duplicate_count:
+            name, ext = os.path.splitext(base_filename)
+            unique_filename = f"{name}_{duplicate_count}{ext}"
+        else:
+            unique_filename = base_filename
         
-        # Add CSV to ZIP
-        csv_content = csv_buffer.getvalue()
-        zip_file.writestr('quiz.csv', csv_content)
+        csv_writer.writerow([
+            item.text or '',
+            item.correct_position,
+            item.item_order,
+            unique_filename
+        ])
         
-        # Add metadata
-        metadata = f"title,{quiz.title}\n"
-        metadata += f"description,{quiz.description or ''}\n"
-        metadata += f"num_positions,{quiz.num_positions}\n"
-        zip_file.writestr('metadata.txt', metadata)
-    
-    zip_buffer.seek(0)
-    return zip_buffer, None
+        images.append((item.image_url, f"images/{unique_filename}"))
+    
+    # Look up GCS blobs now, concurrently, so a missing object is skipped instead of
+    # failing after the response has started. Only metadata is fetched here.
+    gcs_names = {
+        image_url: unquote(urlparse(image_url).path.rsplit('/', 1)[-1])
+        for image_url, _ in images if image_url.startswith('http')
+    }
+    gcs_blobs = {}
+    client = get_gcs_client() if gcs_names else None
+    if client is not None:
+        bucket = client.bucket(GCS_BUCKET_NAME)
+        with ThreadPoolExecutor(max_workers=GCS_UPLOAD_WORKERS) as executor:
+            gcs_blobs = dict(zip(gcs_names, executor.map(bucket.get_blob, gcs_names.values())))
+    
+    # Add images to ZIP
+    for image_url, arcname in images:
+        if image_url.startswith('http'):
+            blob = gcs_blobs.get(image_url)
+            if blob is not None:  # Skip images missing from GCS, like missing local files
+                zip_stream.add(iter_gcs_blob(blob), arcname)
+        else:
+            image_path = os.path.join(app.config['UPLOAD_FOLDER'], os.path.basename(image_url))
+            try:
+                zip_stream.add_path(image_path, arcname=arcname)
+            except FileNotFoundError:
+                pass  # Skip images missing from local storage
+    
+    # Add CSV to ZIP
+    csv_content = csv_buffer.getvalue()
+    zip_stream.add(csv_content, 'quiz.csv', compress_type=zipfile.ZIP_DEFLATED)
+    
+    # Add metadata
+    metadata = f"title,{quiz.title}\n"
+    metadata += f"description,{quiz.description or ''}\n"
+    metadata += f"num_positions,{quiz.num_positions}\n"
+    zip_stream.add(metadata, 'metadata.txt', compress_type=zipfile.ZIP_DEFLATED)
+    
+    return zip_stream, None
 
 def import_quiz_from_zip(zip_file, admin_id):
     """Import quiz from ZIP file"""
     try:
-        zip_buffer = BytesIO(zip_file.read())
-        zip_buffer.seek(0)
-        
-        with zipfile.ZipFile(zip_buffer, 'r') as zip_obj:
+        # Werkzeug has already spooled the upload (to disk when large), so read the ZIP in place
+        zip_file.stream.seek(0)
+        with zipfile.ZipFile(zip_file.stream, 'r') as zip_obj:
             # Validate required files
             if 'quiz.csv' not in zip_obj.namelist():
                 return None, "Missing quiz.csv in ZIP file"
@@ -193,8 +398,8 @@ def import_quiz_from_zip(zip_file, admin_id):
                             metadata[key] = value
             
             # Read CSV
-            with zip_obj.open('quiz.csv') as f:
-                csv_reader = csv.DictReader(f.read().decode('utf-8').splitlines())
+            with TextIOWrapper(zip_obj.open('quiz.csv'), encoding='utf-8', newline='') as f:
+                csv_reader = csv.DictReader(f)
                 items_data = list(csv_reader)
             
             if not items_data:
@@ -210,40 +415,50 @@ def import_quiz_from_zip(zip_file, admin_id):
                 if f"images/{image_file}" not in image_files:
                     return None, f"Image file referenced in CSV but not found in ZIP: {image_file}"
             
+            # Parse every row and plan image uploads before touching storage or the database,
+            # so bad data is rejected without leaving uploaded images behind
+            num_positions = int(metadata.get('num_positions', 4))
+            uploads = []
+            rows = []
+            for item_data in items_data:
+                image_file = item_data.get('image_file', '').strip()
+                
+                # Generate unique filename
+                name, ext = os.path.splitext(image_file)
+                unique_filename = f"{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{name}{ext}"
+                uploads.append((image_file, unique_filename))
+                
+                rows.append({
+                    'text': item_data.get('text', '') or '',
+                    'original_filename': image_file,
+                    'correct_position': int(item_data.get('correct_position', 1)),
+                    'item_order': int(item_data.get('item_order', 1))
+                })
+            
+            def upload_image(upload):
+                image_file, unique_filename = upload
+                member = zip_obj.getinfo(f"images/{image_file}")
+                with zip_obj.open(member) as img_source:
+                    return upload_fileobj_to_gcs(img_source, unique_filename, size=member.file_size)
+            
+            # Stream images from the ZIP to GCS or local storage concurrently
+            with ThreadPoolExecutor(max_workers=GCS_UPLOAD_WORKERS) as executor:
+                image_urls = list(executor.map(upload_image, uploads))
+            
             # Create quiz
             quiz = Quiz(
                 admin_id=admin_id,
                 title=metadata.get('title', 'Imported Quiz'),
                 description=metadata.get('description', ''),
-                num_positions=int(metadata.get('num_positions', 4))
+                num_positions=num_positions
             )
             db.session.add(quiz)
             db.session.flush()  # Get quiz_id
             
-            # Import items with images
-            for item_data in items_data:
-                image_file = item_data.get('image_file', '').strip()
-                
-                # Extract and save image
-                with zip_obj.open(f"images/{image_file}") as img_source:
-                    # Generate unique filename
-                    name, ext = os.path.splitext(image_file)
-                    unique_filename = f"{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{name}{ext}"
-                    
-                    # Upload to GCS or local storage
-                    image_content = img_source.read()
-                    image_url = upload_file_to_gcs(image_content, unique_filename)
-                
-                # Create quiz item
-                quiz_item = QuizItem(
-                    quiz_id=quiz.quiz_id,
-                    text=item_data.get('text', '') or '',
-                    image_url=image_url,
-                    original_filename=image_file,
-                    correct_position=int(item_data.get('correct_position', 1)),
-                    item_order=int(item_data.get('item_order', 1))
-                )
-                db.session.add(quiz_item)
+            # Create quiz items in a single bulk insert
+            QuizItem.bulk_import(quiz.quiz_id, [
+                {**row, 'image_url': image_url} for row, image_url in zip(rows, image_urls)
+            ])
             
             db.session.commit()
             return quiz.quiz_id, None
@@ -298,7 +513,7 @@ def register():
         return jsonify({'error': 'Email already registered'}), 400
     
     # Create new admin
-    hashed_password = generate_password_hash(data['password'])
+    hashed_password = hash_password(data['password'])
     new_admin = Admin(
         username=data['username'],
         email=data['email'].lower(),
@@ -319,7 +534,12 @@ def login():
     email = data['email'].lower()
     admin = Admin.query.filter_by(email=email).first()
     
-    if admin and check_password_hash(admin.password_hash, data['password']):
+    if admin and verify_password(admin.password_hash, data['password']):
+        # Upgrade legacy or outdated hashes on successful login
+        if password_needs_rehash(admin.password_hash):
+            admin.password_hash = hash_password(data['password'])
+            db.session.commit()
+        
         return jsonify({
             'message': 'Login successful',
             'admin_id': admin.admin_id,
@@ -344,11 +564,11 @@ def change_password():
         return jsonify({'error': 'Admin not found'}), 404
     
     # Verify current password
-    if not check_password_hash(admin.password_hash, current_password):
+    if not verify_password(admin.password_hash, current_password):
         return jsonify({'error': 'Current password is incorrect'}), 401
     
     # Update password
-    admin.password_hash = generate_password_hash(new_password)
+    admin.password_hash = hash_password(new_password)
     db.session.commit()
     
     return jsonify({'message': 'Password changed successfully'}), 200
@@ -357,6 +577,9 @@ def change_password():
 def create_quiz():
     data = request.json
     
+    if data.get('layout_style', 'grid') not in LAYOUT_STYLES:
+        return jsonify({'error': 'Invalid layout_style'}), 400
+    
     new_quiz = Quiz(
         admin_id=data['admin_id'],
         title=data['title'],
@@ -387,8 +610,7 @@ def add_quiz_item(quiz_id):
     
     # Save file to GCS or local storage
     filename = f"{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{secure_filename(file.filename)}"
-    image_content = file.read()
-    image_url = upload_file_to_gcs(image_content, filename)
+    image_url = upload_fileobj_to_gcs(file.stream, filename, content_type=file.mimetype or 'image/webp')
     
     new_item = QuizItem(
         quiz_id=quiz_id,
@@ -412,35 +634,31 @@ def get_quiz(quiz_id):
     if not quiz:
         return jsonify({'error': 'Quiz not found'}), 404
     
-    items = QuizItem.query.filter_by(quiz_id=quiz_id).order_by(QuizItem.item_order).all()
-    
     return jsonify({
         'quiz_id': quiz.quiz_id,
         'title': quiz.title,
         'description': quiz.description,
         'num_positions': quiz.num_positions,
         'layout_style': quiz.layout_style,
-        'items': [{
-            'item_id': item.item_id,
-            'text': item.text,
-            'image_url': item.image_url,
-            'correct_position': item.correct_position,
-            'item_order': item.item_order
-        } for item in items]
+        'items': get_quiz_item_dicts(quiz_id)
     }), 200
 
 @app.route('/api/admin/<int:admin_id>/quizzes', methods=['GET'])
 def get_admin_quizzes(admin_id):
-    quizzes = Quiz.query.filter_by(admin_id=admin_id).all()
+    # Count items in the same query instead of loading quiz.items per quiz
+    quizzes = db.session.query(Quiz, func.count(QuizItem.item_id))\
+        .outerjoin(QuizItem)\
+        .filter(Quiz.admin_id == admin_id)\
+        .group_by(Quiz.quiz_id).all()
     
     quiz_list = []
-    for quiz in quizzes:
+    for quiz, item_count in quizzes:
         quiz_list.append({
             'quiz_id': quiz.quiz_id,
             'title': quiz.title,
             'description': quiz.description,
             'created_at': quiz.created_at.strftime('%Y-%m-%d'),
-            'item_count': len(quiz.items),
+            'item_count': item_count,
             'num_positions': quiz.num_positions
         })
     
@@ -453,6 +671,9 @@ def update_quiz(quiz_id):
         return jsonify({'error': 'Quiz not found'}), 404
     
     data = request.json
+    if data.get('layout_style', quiz.layout_style) not in LAYOUT_STYLES:
+        return jsonify({'error': 'Invalid layout_style'}), 400
+    
     quiz.title = data.get('title', quiz.title)
     quiz.description = data.get('description', quiz.description)
     quiz.num_positions = data.get('num_positions', quiz.num_positions)
@@ -471,9 +692,17 @@ def delete_quiz(quiz_id):
     if not quiz:
         return jsonify({'error': 'Quiz not found'}), 404
     
+    game_codes = [code for code, in db.session.query(GameSession.game_code).filter_by(quiz_id=quiz_id)]
+    
+    # Items, sessions, participants and answers go with the quiz through ON DELETE CASCADE
     db.session.delete(quiz)
     db.session.commit()
     
+    # The database cascade skips ORM events, so drop this quiz's games from the in-process maps here
+    for game_code in game_codes:
+        ACTIVE_GAMES.pop(game_code, None)
+        GAME_CACHE.pop(game_code, None)
+    
     return jsonify({'message': 'Quiz deleted successfully'}), 200
 
 @app.route('/api/quiz/item/<int:item_id>', methods=['PUT'])
@@ -493,8 +722,7 @@ def update_quiz_item(item_id):
         file = request.files['image']
         if file and file.filename != '':
             filename = f"{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{secure_filename(file.filename)}"
-            image_content = file.read()
-            image_url = upload_file_to_gcs(image_content, filename)
+            image_url = upload_fileobj_to_gcs(file.stream, filename, content_type=file.mimetype or 'image/webp')
             item.image_url = image_url
     
     db.session.commit()
@@ -523,7 +751,7 @@ def export_quiz(quiz_id):
     if not admin_id:
         return jsonify({'error': 'admin_id required'}), 400
     
-    zip_buffer, error = export_quiz_to_zip(quiz_id, admin_id)
+    zip_stream, error = export_quiz_to_zip(quiz_id, admin_id)
     
     if error:
         return jsonify({'error': error}), 404
@@ -532,12 +760,17 @@ def export_quiz(quiz_id):
     quiz = Quiz.query.get(quiz_id)
     filename = f"{quiz.title.replace(' ', '_')}_export.zip"
     
-    return send_file(
-        zip_buffer,
-        mimetype='application/zip',
-        as_attachment=True,
-        download_name=filename
-    )
+    # Quote the name and add an RFC 5987 filename* for non-ASCII titles, as send_file does
+    try:
+        filename.encode('ascii')
+        names = {'filename': filename}
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        names = {'filename': simple, 'filename*': f"UTF-8''{quote(filename, safe='!#$&+-.^_`|~')}"}
+    
+    response = Response(zip_stream, mimetype='application/zip')
+    response.headers.set('Content-Disposition', 'attachment', **names)
+    return response
 
 @app.route('/api/quiz/import', methods=['POST'])
 def import_quiz():
@@ -574,17 +807,33 @@ def start_game():
     quiz_id = data['quiz_id']
     admin_id = data['admin_id']
     
-    game_code = generate_game_code()
+    # Check the parents first so an IntegrityError below can only be a game_code collision
+    if not Quiz.query.get(quiz_id):
+        return jsonify({'error': 'Quiz not found'}), 404
+    if not Admin.query.get(admin_id):
+        return jsonify({'error': 'Admin not found'}), 404
     
-    new_game = GameSession(
-        quiz_id=quiz_id,
-        admin_id=admin_id,
-        game_code=game_code,
-        status='waiting'
-    )
+    # The unique constraint on game_code rejects collisions, so retry with a new code
+    for attempt in range(GAME_CODE_ATTEMPTS):
+        game_code = generate_game_code()
+        
+        new_game = GameSession(
+            quiz_id=quiz_id,
+            admin_id=admin_id,
+            game_code=game_code,
+            status='waiting'
+        )
+        
+        db.session.add(new_game)
+        try:
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == GAME_CODE_ATTEMPTS - 1:
+                return jsonify({'error': 'Could not allocate a game code'}), 500
     
-    db.session.add(new_game)
-    db.session.commit()
+    ACTIVE_GAMES[game_code] = new_game.game_session_id
     
     return jsonify({
         'message': 'Game started successfully',
@@ -598,16 +847,20 @@ def join_game():
     game_code = data['game_code'].upper()
     nickname = data['nickname']
     
-    game = GameSession.query.filter_by(game_code=game_code).first()
-    
-    if not game:
-        return jsonify({'error': 'Game not found'}), 404
-    
-    if game.status == 'completed':
-        return jsonify({'error': 'Game has ended'}), 400
+    game_session_id = ACTIVE_GAMES.get(game_code)
+    if game_session_id is None:
+        game = GameSession.query.filter_by(game_code=game_code).first()
+        
+        if not game:
+            return jsonify({'error': 'Game not found'}), 404
+        
+        if game.status == 'completed':
+            return jsonify({'error': 'Game has ended'}), 400
+        
+        game_session_id = ACTIVE_GAMES[game_code] = game.game_session_id
     
     new_participant = Participant(
-        game_session_id=game.game_session_id,
+        game_session_id=game_session_id,
         nickname=nickname
     )
     
@@ -617,10 +870,39 @@ def join_game():
     return jsonify({
         'message': 'Joined game successfully',
         'participant_id': new_participant.participant_id,
-        'game_session_id': game.game_session_id
+        'game_session_id': game_session_id
     }), 200
 
 # SocketIO events
+# Per-game scoring data keyed by game_code, filled on start_game and dropped on end_game.
+# Bounded because hosts can leave without ending a game; evicted games fall back to quiz_answer_key.
+GAME_CACHE_SIZE = 500
+GAME_CACHE = LRUDict(GAME_CACHE_SIZE)
+
+@lru_cache(maxsize=512)
+def quiz_answer_key(quiz_id):
+    """Map a quiz's item ids (as strings, like submitted answers) to their correct positions"""
+    rows = db.session.execute(lambda_stmt(
+        lambda: db.select(QuizItem.item_id, QuizItem.correct_position).where(QuizItem.quiz_id == quiz_id)
+    )).all()
+    return {str(item_id): correct_position for item_id, correct_position in rows}
+
+# Quizzes rarely change, so any item or quiz write simply drops every cached answer key
+@event.listens_for(Quiz, 'after_insert')
+@event.listens_for(Quiz, 'after_delete')
+@event.listens_for(QuizItem, 'after_insert')
+@event.listens_for(QuizItem, 'after_update')
+@event.listens_for(QuizItem, 'after_delete')
+def clear_quiz_answer_keys(mapper, connection, target):
+    quiz_answer_key.cache_clear()
+    # Another greenlet can re-cache the old rows before this flush commits, so clear again after it
+    object_session(target).info['quiz_answer_keys_stale'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def clear_stale_quiz_answer_keys(session):
+    if session.info.pop('quiz_answer_keys_stale', False):
+        quiz_answer_key.cache_clear()
+
 @socketio.on('join_game')
 def handle_join_game(data):
     game_code = data['game_code']
@@ -650,7 +932,15 @@ def handle_start_game(data):
         db.session.commit()
         
         quiz = Quiz.query.get(game.quiz_id)
-        items = QuizItem.query.filter_by(quiz_id=quiz.quiz_id).order_by(QuizItem.item_order).all()
+        items = get_quiz_item_dicts(quiz.quiz_id)
+        
+        # Keep what scoring needs in memory for the rest of the game
+        GAME_CACHE[game_code] = {
+            'game_session_id': game.game_session_id,
+            'num_positions': quiz.num_positions,
+            # Keyed by the string ids the client sends, so scoring needs no casts
+            'correct': {str(item['item_id']): item['correct_position'] for item in items}
+        }
         
         emit('game_started', {
             'quiz': {
@@ -658,13 +948,7 @@ def handle_start_game(data):
                 'description': quiz.description,
                 'num_positions': quiz.num_positions,
                 'layout_style': quiz.layout_style,
-                'items': [{
-                    'item_id': item.item_id,
-                    'text': item.text,
-                    'image_url': item.image_url,
-                    'item_order': item.item_order,
-                    'correct_position': item.correct_position
-                } for item in items]
+                'items': items
             }
         }, room=f'game_{game_code}')
 
@@ -673,34 +957,46 @@ def handle_submit_answer(data):
     participant_id = data['participant_id']
     answers = data['answers']  # {item_id: position}
     
-    participant = Participant.query.get(participant_id)
-    if not participant:
+    # Runs once per player per game, so reuse the cached statement and only bind the id
+    game_session_id = db.session.execute(lambda_stmt(
+        lambda: db.select(Participant.game_session_id).where(Participant.participant_id == participant_id)
+    )).scalar()
+    if game_session_id is None:
         return
     
-    game = GameSession.query.get(participant.game_session_id)
-    quiz = Quiz.query.get(game.quiz_id)
-    
-    # Calculate score
-    correct_count = 0
     total_items = len(answers)
     
-    for item_id, position in answers.items():
-        item = QuizItem.query.get(int(item_id))
-        if item and item.correct_position == position:
-            correct_count += 1
-            
-            # Save answer
-            answer = ParticipantAnswer(
-                participant_id=participant_id,
-                item_id=item_id,
-                given_position=position,
-                is_correct=True
-            )
-            db.session.add(answer)
+    game_cache = GAME_CACHE.get(data.get('game_code'))
+    if game_cache and game_cache['game_session_id'] == game_session_id:
+        correct = game_cache['correct']
+    else:
+        # Game not cached in this process, fall back to the per-quiz answer key
+        quiz_id = db.session.query(GameSession.quiz_id).filter_by(game_session_id=game_session_id).scalar()
+        correct = quiz_answer_key(quiz_id)
     
-    # Update participant score
+    # Calculate score
+    correct_ids = [item_id for item_id, position in answers.items() if correct.get(item_id) == position]
+    correct_count = len(correct_ids)
+    
+    # A resubmission replaces the earlier answers, just as it overwrites total_score
+    db.session.execute(db.delete(ParticipantAnswer).where(ParticipantAnswer.participant_id == participant_id))
+    
+    # Save correct answers
+    answer_rows = [{
+        'participant_id': participant_id,
+        'item_id': int(item_id),
+        'given_position': answers[item_id],
+        'is_correct': True
+    } for item_id in correct_ids]
+    ParticipantAnswer.bulk_create(answer_rows)
+    
+    # Update the stored total_score in the same transaction so the leaderboard never re-aggregates answers
     points_earned = int((correct_count / total_items) * 1000) if total_items > 0 else 0
-    participant.total_score = points_earned
+    db.session.execute(
+        db.update(Participant)
+        .where(Participant.participant_id == participant_id)
+        .values(total_score=points_earned, submitted_at=db.func.now())
+    )
     db.session.commit()
     
     emit('answer_result', {
@@ -713,16 +1009,23 @@ def handle_submit_answer(data):
 def handle_get_results(data):
     game_code = data['game_code']
     
-    game = GameSession.query.filter_by(game_code=game_code).first()
-    if not game:
-        return
+    game_session_id = ACTIVE_GAMES.get(game_code)
+    if game_session_id is None:
+        game = GameSession.query.filter_by(game_code=game_code).first()
+        if not game:
+            return
+        game_session_id = game.game_session_id
     
-    participants = Participant.query.filter_by(game_session_id=game.game_session_id)\
-        .order_by(Participant.total_score.desc()).all()
+    participants = db.session.execute(lambda_stmt(
+        lambda: db.select(Participant.nickname, Participant.total_score, Participant.correct_count.label('correct_count'))
+        .where(Participant.game_session_id == game_session_id)
+        .order_by(Participant.total_score.desc())
+    )).all()
     
     leaderboard = [{
         'nickname': p.nickname,
         'score': p.total_score,
+        'correct_count': p.correct_count,
         'rank': idx + 1
     } for idx, p in enumerate(participants)]
     
@@ -738,6 +1041,8 @@ def handle_end_game(data):
     if game:
         game.status = 'completed'
         db.session.commit()
+        GAME_CACHE.pop(game_code, None)
+        ACTIVE_GAMES.pop(game_code, None)
         
         emit('game_ended', {}, room=f'game_{game_code}')
 
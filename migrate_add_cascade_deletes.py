@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Migration script to add ON DELETE CASCADE to the quiz, session, participant and answer foreign keys
+"""
+
+from app import app, db
+from sqlalchemy import inspect, text
+
+# Child tables in dependency order, each with the foreign keys that now cascade
+CASCADE_TABLES = [
+    ('quiz_items', [('quiz_id', 'quizzes', 'quiz_id')]),
+    ('game_sessions', [('quiz_id', 'quizzes', 'quiz_id')]),
+    ('participants', [('game_session_id', 'game_sessions', 'game_session_id')]),
+    ('participant_answers', [
+        ('participant_id', 'participants', 'participant_id'),
+        ('item_id', 'quiz_items', 'item_id'),
+    ]),
+]
+
+def migrate_postgresql(connection):
+    # Re-adding each foreign key validates every existing row, which can outlast the app's 5s statement_timeout
+    connection.execute(text("SET statement_timeout = 0"))
+    inspector = inspect(connection)
+    for table, foreign_keys in CASCADE_TABLES:
+        existing = {tuple(fk['constrained_columns']): fk['name'] for fk in inspector.get_foreign_keys(table)}
+        for column, referred_table, referred_column in foreign_keys:
+            name = existing.get((column,)) or f"{table}_{column}_fkey"
+            connection.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}"))
+            connection.execute(text(
+                f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+                f"REFERENCES {referred_table} ({referred_column}) ON DELETE CASCADE"
+            ))
+            print(f"✓ {table}.{column} now cascades deletes from {referred_table}")
+
+def migrate_sqlite(connection):
+    # SQLite cannot alter constraints, so each child table is rebuilt from the models and refilled
+    connection.execute(text("PRAGMA foreign_keys=OFF"))
+    tables = [db.metadata.tables[table] for table, _ in CASCADE_TABLES]
+    
+    # The rebuild only copies model columns, so refuse to run while older migrations still have data to move
+    for table in tables:
+        old_columns = {row[1] for row in connection.execute(text(f"PRAGMA table_info({table.name})"))}
+        extra_columns = sorted(old_columns - set(table.columns.keys()))
+        if extra_columns:
+            raise RuntimeError(
+                f"{table.name} has columns the models no longer define ({', '.join(extra_columns)}); "
+                "run the earlier migrations first, e.g. migrate_move_answered_at.py for answered_at"
+            )
+    
+    for table in tables:
+        for index in table.indexes:
+            connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        connection.execute(text(f"ALTER TABLE {table.name} RENAME TO {table.name}_old"))
+    
+    db.metadata.create_all(connection, tables=tables)
+    
+    for table in tables:
+        old_columns = {row[1] for row in connection.execute(text(f"PRAGMA table_info({table.name}_old)"))}
+        columns = ', '.join(column.name for column in table.columns if column.name in old_columns)
+        connection.execute(text(
+            f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_old"
+        ))
+        print(f"✓ Rebuilt {table.name} with cascading foreign keys")
+    
+    for table in reversed(tables):
+        connection.execute(text(f"DROP TABLE {table.name}_old"))
+    
+    # The pragma only takes effect outside a transaction, and this connection goes back to the pool
+    connection.commit()
+    connection.execute(text("PRAGMA foreign_keys=ON"))
+
+def migrate():
+    with app.app_context():
+        try:
+            with db.engine.connect() as connection:
+                if db.engine.dialect.name == 'postgresql':
+                    migrate_postgresql(connection)
+                else:
+                    migrate_sqlite(connection)
+                connection.commit()
+            
+            print("✓ Successfully added cascading deletes")
+        
+        except Exception as e:
+            print(f"✗ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    migrate()
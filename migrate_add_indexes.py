@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Migration script to add indexes on hot lookup columns
+"""
+
+from app import app, db
+from sqlalchemy import text
+
+INDEXES = [
+    ('ix_quiz_admin', 'quizzes', 'admin_id'),
+    ('ix_quizitem_quiz_order', 'quiz_items', 'quiz_id, item_order'),
+    ('ix_participant_session_score', 'participants', 'game_session_id, total_score'),
+    ('ix_gamesession_quiz', 'game_sessions', 'quiz_id'),
+    ('ix_gamesession_admin', 'game_sessions', 'admin_id'),
+    ('ix_panswers_participant_item', 'participant_answers', 'participant_id, item_id'),
+    ('ix_panswers_item', 'participant_answers', 'item_id'),
+]
+
+def migrate():
+    with app.app_context():
+        try:
+            # PostgreSQL can build indexes without locking writes, but only outside a transaction
+            concurrently = 'CONCURRENTLY ' if db.engine.dialect.name == 'postgresql' else ''
+            
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                if db.engine.dialect.name == 'postgresql':
+                    # Index builds scan whole tables, which can outlast the app's 5s statement_timeout
+                    connection.execute(text("SET statement_timeout = 0"))
+                
+                for name, table, columns in INDEXES:
+                    connection.execute(text(
+                        f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})"
+                    ))
+                    print(f"✓ Index '{name}' exists on {table} ({columns})")
+            
+            print("✓ Successfully added indexes")
+            
+        except Exception as e:
+            print(f"✗ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Migration script to move created_at/joined_at defaults into the database
+"""
+
+from app import app, db
+from sqlalchemy import text
+
+TIMESTAMP_COLUMNS = [
+    ('admin', 'created_at'),
+    ('quizzes', 'created_at'),
+    ('game_sessions', 'created_at'),
+    ('participants', 'joined_at'),
+]
+
+def migrate():
+    with app.app_context():
+        try:
+            with db.engine.connect() as connection:
+                if db.engine.dialect.name == 'postgresql':
+                    # The timestamptz conversions rewrite each table, which can outlast the app's 5s statement_timeout
+                    connection.execute(text("SET statement_timeout = 0"))
+                
+                # Rows inserted without a Python default before this migration have no timestamp
+                for table, column in TIMESTAMP_COLUMNS:
+                    filled = connection.execute(text(
+                        f"UPDATE {table} SET {column} = CURRENT_TIMESTAMP WHERE {column} IS NULL"
+                    )).rowcount
+                    if filled:
+                        print(f"✓ Filled {filled} missing {table}.{column} values")
+                
+                if db.engine.dialect.name != 'postgresql':
+                    # SQLite cannot alter columns in place; the models also send now() on insert
+                    connection.commit()
+                    print("✓ Column types and defaults can only be altered on PostgreSQL")
+                    return
+                
+                for table, column in TIMESTAMP_COLUMNS:
+                    data_type = connection.execute(text(
+                        "SELECT data_type FROM information_schema.columns "
+                        "WHERE table_name = :table AND column_name = :column"
+                    ), {'table': table, 'column': column}).scalar()
+                    if data_type == 'timestamp without time zone':
+                        # The old Python default stored naive UTC values
+                        connection.execute(text(
+                            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE TIMESTAMP WITH TIME ZONE "
+                            f"USING {column} AT TIME ZONE 'UTC'"
+                        ))
+                    connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT now()"))
+                    connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+                    print(f"✓ {table}.{column} is now a NOT NULL timestamptz defaulting to now()")
+                connection.commit()
+            
+            print("✓ Successfully added database-side timestamp defaults")
+            
+        except Exception as e:
+            print(f"✗ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    migrate()
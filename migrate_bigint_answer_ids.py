@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Migration script to widen participant_answers ids to BIGINT with a cached sequence
+"""
+
+from app import app, db
+from sqlalchemy import text
+
+def migrate():
+    with app.app_context():
+        try:
+            if db.engine.dialect.name != 'postgresql':
+                # SQLite integer keys are already 64-bit
+                print("✓ Nothing to do: participant_answer_id only needs widening on PostgreSQL")
+                return
+            
+            with db.engine.connect() as connection:
+                # Widening the key rewrites all of participant_answers, which outlasts the app's 5s statement_timeout
+                connection.execute(text("SET statement_timeout = 0"))
+                connection.execute(text(
+                    "ALTER TABLE participant_answers ALTER COLUMN participant_answer_id TYPE BIGINT"
+                ))
+                print("✓ participant_answers.participant_answer_id is now BIGINT")
+                
+                # Existing tables use a SERIAL sequence rather than an identity column
+                sequence = connection.execute(text(
+                    "SELECT pg_get_serial_sequence('participant_answers', 'participant_answer_id')"
+                )).scalar()
+                if sequence:
+                    connection.execute(text(f"ALTER SEQUENCE {sequence} AS BIGINT CACHE 1000"))
+                    print(f"✓ {sequence} now caches 1000 values per connection")
+                
+                connection.commit()
+            
+            print("✓ Successfully migrated participant answer ids")
+        
+        except Exception as e:
+            print(f"✗ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Migration script to convert game_sessions.status and quizzes.layout_style to enum types
+"""
+
+from app import app, db
+from models import LAYOUT_STYLES, SESSION_STATUSES
+from sqlalchemy import text
+
+ENUM_COLUMNS = [
+    ('session_status', 'game_sessions', 'status', SESSION_STATUSES, 'waiting'),
+    ('layout_style', 'quizzes', 'layout_style', LAYOUT_STYLES, 'grid'),
+]
+
+def migrate():
+    with app.app_context():
+        try:
+            if db.engine.dialect.name != 'postgresql':
+                # SQLite stores enums as VARCHAR, so the existing columns already match
+                print("✓ Nothing to do: enum types are only created on PostgreSQL")
+                return
+            
+            with db.engine.connect() as connection:
+                # The enum conversions rewrite quizzes and game_sessions, which can outlast the app's 5s statement_timeout
+                connection.execute(text("SET statement_timeout = 0"))
+                for type_name, table, column, values, default in ENUM_COLUMNS:
+                    exists = connection.execute(
+                        text("SELECT 1 FROM pg_type WHERE typname = :name"), {'name': type_name}
+                    ).scalar()
+                    if exists:
+                        print(f"✓ Type '{type_name}' already exists")
+                        continue
+                    
+                    labels = ', '.join(f"'{value}'" for value in values)
+                    connection.execute(text(f"CREATE TYPE {type_name} AS ENUM ({labels})"))
+                    connection.execute(text(f"UPDATE {table} SET {column} = '{default}' WHERE {column} IS NULL"))
+                    connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT"))
+                    connection.execute(text(
+                        f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_name} USING {column}::{type_name}"
+                    ))
+                    connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT '{default}'"))
+                    connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+                    print(f"✓ Converted {table}.{column} to {type_name}")
+                connection.commit()
+            
+            print("✓ Successfully converted enum columns")
+            
+        except Exception as e:
+            print(f"✗ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    migrate()
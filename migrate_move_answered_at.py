@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Migration script to replace participant_answers.answered_at with participants.submitted_at
+"""
+
+from app import app, db
+from sqlalchemy import text
+
+def migrate():
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            participant_columns = [col['name'] for col in inspector.get_columns('participants')]
+            answer_types = {col['name']: col['type'] for col in inspector.get_columns('participant_answers')}
+            answer_columns = list(answer_types)
+            is_postgresql = db.engine.dialect.name == 'postgresql'
+            timestamp_type = 'TIMESTAMP WITH TIME ZONE' if is_postgresql else 'DATETIME'
+            
+            # The original answered_at held naive UTC values; read them as UTC rather than in the session time zone
+            naive_answered_at = is_postgresql and not getattr(answer_types.get('answered_at'), 'timezone', False)
+            latest_answer = "MAX(answered_at) AT TIME ZONE 'UTC'" if naive_answered_at else "MAX(answered_at)"
+            
+            with db.engine.connect() as connection:
+                if db.engine.dialect.name == 'postgresql':
+                    # The submitted_at backfill scans every answer, which can outlast the app's 5s statement_timeout
+                    connection.execute(text("SET statement_timeout = 0"))
+                
+                if 'submitted_at' not in participant_columns:
+                    connection.execute(text(
+                        f"ALTER TABLE participants ADD COLUMN submitted_at {timestamp_type}"
+                    ))
+                    print("✓ Added 'submitted_at' column to participants table")
+                
+                if 'answered_at' in answer_columns:
+                    # All answers from one submission share a timestamp, so keep the latest per participant
+                    connection.execute(text(
+                        "UPDATE participants SET submitted_at = ("
+                        f"SELECT {latest_answer} FROM participant_answers "
+                        "WHERE participant_answers.participant_id = participants.participant_id"
+                        ") WHERE submitted_at IS NULL"
+                    ))
+                    connection.execute(text("ALTER TABLE participant_answers DROP COLUMN answered_at"))
+                    print("✓ Moved answer timestamps to participants.submitted_at")
+                else:
+                    print("✓ Column 'answered_at' already removed from participant_answers table")
+                
+                connection.commit()
+            
+        except Exception as e:
+            print(f"✗ Error during migration: {e}")
+            raise
+
+if __name__ == '__main__':
+    migrate()
@@ -1,8 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timezone
+from sqlalchemy.ext.hybrid import hybrid_property
 
 db = SQLAlchemy()
 
+LAYOUT_STYLES = ('grid', 'mindmap')
+SESSION_STATUSES = ('waiting', 'active', 'completed')
+
 class Admin(db.Model):
     __tablename__ = 'admin'
     
@@ -10,7 +13,8 @@ class Admin(db.Model):
     username = db.Column(db.String(50), nullable=False, unique=True)
     email = db.Column(db.String(100), nullable=False, unique=True)
     password_hash = db.Column(db.String(255), nullable=False)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # default= also sends now() in the INSERT, for SQLite tables created before the server default existed
+    created_at = db.Column(db.DateTime(timezone=True), default=db.func.now(), server_default=db.func.now(), nullable=False)
     
     # Relationships
     quizzes = db.relationship('Quiz', backref='admin', lazy=True, cascade='all, delete-orphan')
@@ -18,24 +22,31 @@ class Admin(db.Model):
 
 class Quiz(db.Model):
     __tablename__ = 'quizzes'
+    __table_args__ = (
+        db.Index('ix_quiz_admin', 'admin_id'),
+    )
     
     quiz_id = db.Column(db.Integer, primary_key=True)
     admin_id = db.Column(db.Integer, db.ForeignKey('admin.admin_id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     num_positions = db.Column(db.Integer, default=4)  # Number of drop zones (e.g., 1, 2, 3, 4)
-    layout_style = db.Column(db.String(20), default='grid')  # 'grid' or 'mindmap'
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    layout_style = db.Column(db.Enum(*LAYOUT_STYLES, name='layout_style'), nullable=False, default='grid', server_default='grid')
+    created_at = db.Column(db.DateTime(timezone=True), default=db.func.now(), server_default=db.func.now(), nullable=False)
     
     # Relationships
-    items = db.relationship('QuizItem', backref='quiz', lazy=True, cascade='all, delete-orphan')
-    game_sessions = db.relationship('GameSession', backref='quiz', lazy=True, cascade='all, delete-orphan')
+    # passive_deletes leaves child rows to the ON DELETE CASCADE foreign keys instead of loading them
+    items = db.relationship('QuizItem', backref='quiz', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    game_sessions = db.relationship('GameSession', backref='quiz', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
 class QuizItem(db.Model):
     __tablename__ = 'quiz_items'
+    __table_args__ = (
+        db.Index('ix_quizitem_quiz_order', 'quiz_id', 'item_order'),
+    )
     
     item_id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.quiz_id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.quiz_id', ondelete='CASCADE'), nullable=False)
     text = db.Column(db.String(255))  # Optional text description
     image_url = db.Column(db.String(500), nullable=False)  # Path to uploaded image
     original_filename = db.Column(db.String(255))  # Original filename from import/export
@@ -43,39 +54,79 @@ class QuizItem(db.Model):
     item_order = db.Column(db.Integer, nullable=False)  # Order for display
     
     # Relationships
-    participant_answers = db.relationship('ParticipantAnswer', backref='item', lazy=True)
+    participant_answers = db.relationship('ParticipantAnswer', backref='item', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    
+    @classmethod
+    def bulk_import(cls, quiz_id, items):
+        """Insert a quiz's items (list of column dicts) as a single executemany"""
+        if items:
+            db.session.execute(db.insert(cls), [{'quiz_id': quiz_id, **item} for item in items])
 
 class GameSession(db.Model):
     __tablename__ = 'game_sessions'
+    __table_args__ = (
+        db.Index('ix_gamesession_quiz', 'quiz_id'),
+        db.Index('ix_gamesession_admin', 'admin_id'),
+    )
     
     game_session_id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.quiz_id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.quiz_id', ondelete='CASCADE'), nullable=False)
     admin_id = db.Column(db.Integer, db.ForeignKey('admin.admin_id'), nullable=False)
-    game_code = db.Column(db.String(10), unique=True, nullable=False)
-    status = db.Column(db.String(20), default='waiting')  # waiting, active, completed
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    game_code = db.Column(db.String(8), unique=True, nullable=False)  # Unique constraint doubles as the lookup index
+    status = db.Column(db.Enum(*SESSION_STATUSES, name='session_status'), nullable=False, default='waiting', server_default='waiting')
+    created_at = db.Column(db.DateTime(timezone=True), default=db.func.now(), server_default=db.func.now(), nullable=False)
     
     # Relationships
-    participants = db.relationship('Participant', backref='game_session', lazy=True, cascade='all, delete-orphan')
+    participants = db.relationship('Participant', backref='game_session', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
 class Participant(db.Model):
     __tablename__ = 'participants'
+    __table_args__ = (
+        db.Index('ix_participant_session_score', 'game_session_id', 'total_score'),
+    )
     
     participant_id = db.Column(db.Integer, primary_key=True)
-    game_session_id = db.Column(db.Integer, db.ForeignKey('game_sessions.game_session_id'), nullable=False)
+    game_session_id = db.Column(db.Integer, db.ForeignKey('game_sessions.game_session_id', ondelete='CASCADE'), nullable=False)
     nickname = db.Column(db.String(50), nullable=False)
     total_score = db.Column(db.Integer, default=0)
-    joined_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    joined_at = db.Column(db.DateTime(timezone=True), default=db.func.now(), server_default=db.func.now(), nullable=False)
+    submitted_at = db.Column(db.DateTime(timezone=True))  # Shared by all answers from the submission
     
     # Relationships
-    answers = db.relationship('ParticipantAnswer', backref='participant', lazy=True, cascade='all, delete-orphan')
+    answers = db.relationship('ParticipantAnswer', backref='participant', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    
+    @hybrid_property
+    def correct_count(self):
+        return sum(1 for answer in self.answers if answer.is_correct)
+    
+    @correct_count.expression
+    def correct_count(cls):
+        # Correlated COUNT so leaderboard queries aggregate in the database
+        return db.select(db.func.count(ParticipantAnswer.participant_answer_id))\
+            .where(ParticipantAnswer.participant_id == cls.participant_id, ParticipantAnswer.is_correct.is_(True))\
+            .correlate(cls)\
+            .scalar_subquery()
 
 class ParticipantAnswer(db.Model):
     __tablename__ = 'participant_answers'
+    __table_args__ = (
+        db.Index('ix_panswers_participant_item', 'participant_id', 'item_id'),
+        db.Index('ix_panswers_item', 'item_id'),
+    )
     
-    participant_answer_id = db.Column(db.Integer, primary_key=True)
-    participant_id = db.Column(db.Integer, db.ForeignKey('participants.participant_id'), nullable=False)
-    item_id = db.Column(db.Integer, db.ForeignKey('quiz_items.item_id'), nullable=False)
+    # Highest insert-rate table: 64-bit ids, and the identity hands out values in blocks of 1000
+    participant_answer_id = db.Column(
+        db.BigInteger().with_variant(db.Integer, 'sqlite'),  # SQLite only autoincrements INTEGER keys
+        db.Identity(start=1, cache=1000),
+        primary_key=True
+    )
+    participant_id = db.Column(db.Integer, db.ForeignKey('participants.participant_id', ondelete='CASCADE'), nullable=False)
+    item_id = db.Column(db.Integer, db.ForeignKey('quiz_items.item_id', ondelete='CASCADE'), nullable=False)
     given_position = db.Column(db.Integer, nullable=False)  # Position player placed the item
     is_correct = db.Column(db.Boolean, default=False)
-    answered_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    @classmethod
+    def bulk_create(cls, rows):
+        """Insert answer rows (list of column dicts) as a single executemany"""
+        if rows:
+            db.session.execute(db.insert(cls), rows)